@@ -1,20 +1,32 @@
 import atexit
+import itertools
 import json
+import os
+import queue
 import sqlite3
 import threading
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
+import weakref
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
 from flask import (
     Flask,
+    Response,
     abort,
     jsonify,
     render_template,
     request,
     send_from_directory,
+    stream_template,
 )
-from werkzeug.exceptions import HTTPException
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import HTTPException, NotFound
 
 BASE_DIR = Path(__file__).resolve().parent
 CONFIG_PATH = BASE_DIR / "config.json"
@@ -23,6 +35,11 @@ DB_PATH = DATA_DIR / "labels.db"
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
 VALID_STATUSES = {"pending", "in_progress", "done"}
+LABELS_PAGE_SIZE = 500
+IMAGE_CACHE_SECONDS = 3600
+GZIP_MIN_BYTES = 1024
+GZIP_ENDPOINTS = {"api_labels_view", "api_labels_ndjson", "labels_view"}
+SYNC_INTERVAL_SECONDS = 30
 
 app = Flask(
     __name__,
@@ -30,16 +47,62 @@ app = Flask(
     template_folder=str(BASE_DIR / "templates"),
 )
 
+
+class OrjsonProvider(JSONProvider):
+    """Route jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if kwargs.pop("sort_keys", False) else 0
+        if kwargs:
+            raise TypeError(f"Unsupported JSON dumps options: {', '.join(sorted(kwargs))}")
+        return orjson.dumps(obj, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
+app.json = OrjsonProvider(app)
+
 _config_lock = threading.Lock()
 _config_cache = None
+_image_dir_cache = None
+_sync_lock = threading.Lock()
+_sync_stop = threading.Event()
+_sync_thread = None
+_last_sync_mtime = None
+_startup_pid = os.getpid()
+
 
+def _reset_module_locks():
+    # A fork can land while the watcher thread holds one of these (e.g. a
+    # gunicorn master under --preload replacing a worker mid-sync); the
+    # child would inherit it locked with no owner to release it.
+    global _config_lock, _sync_lock
+    _config_lock = threading.Lock()
+    _sync_lock = threading.Lock()
 
-def utcnow():
-    return datetime.now(timezone.utc)
+
+os.register_at_fork(after_in_child=_reset_module_locks)
+
+
+@lru_cache(maxsize=8)
+def _timestamp_prefix(seconds):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+
+
+def format_timestamp(ns):
+    # Same shape as datetime.isoformat() with a Z suffix, but the
+    # date/time prefix is formatted once per second and reused.
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    return f"{_timestamp_prefix(seconds)}.{remainder // 1000:06d}Z"
 
 
 def timestamp():
-    return utcnow().isoformat().replace("+00:00", "Z")
+    return format_timestamp(time.time_ns())
 
 
 def load_config():
@@ -52,181 +115,438 @@ def load_config():
 
 
 def get_image_directory():
+    global _image_dir_cache
+    if _image_dir_cache is not None:
+        return _image_dir_cache
     config = load_config()
-    image_dir = Path(config.get("image_directory", "images"))
-    if not image_dir.is_absolute():
-        image_dir = (BASE_DIR / image_dir).resolve()
-    image_dir.mkdir(parents=True, exist_ok=True)
-    return image_dir
+    with _config_lock:
+        if _image_dir_cache is None:
+            image_dir = Path(config.get("image_directory", "images"))
+            if not image_dir.is_absolute():
+                image_dir = (BASE_DIR / image_dir).resolve()
+            _image_dir_cache = image_dir
+        return _image_dir_cache
+
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=30000",
+)
 
 
-def get_db_connection():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+def connect_db(path, query_only=False):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    if query_only:
+        conn.execute("PRAGMA query_only=ON")
     return conn
 
 
-def init_db():
-    conn = get_db_connection()
+class _ThreadConnection:
+    """Per-thread holder; its connection is closed when the thread ends."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.finalizer = weakref.finalize(self, _close_quietly, conn)
+
+
+def _close_quietly(conn):
     try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT UNIQUE NOT NULL,
-                status TEXT NOT NULL DEFAULT 'pending',
-                labels_json TEXT,
-                reserved_by TEXT,
-                reserved_at TEXT,
-                skipped INTEGER NOT NULL DEFAULT 0,
-                updated_at TEXT
-            )
-            """
-        )
-        conn.commit()
-    finally:
         conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class ConnectionPool:
+    """Hands out one long-lived, read-only SQLite connection per thread.
+
+    The connection lives as long as its thread: the threaded development
+    server starts a thread per request, so holding connections past that
+    would leak one per request. All writes go through ``DatabaseWriter``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._holders = weakref.WeakSet()
+        self._reset()
+        # SQLite connections must not cross a fork; forked WSGI workers
+        # start with an empty pool and open their own.
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _reset_after_fork(self):
+        # Abandon, rather than close, connections inherited from the parent.
+        for holder in list(self._holders):
+            holder.finalizer.detach()
+        self._holders = weakref.WeakSet()
+        self._reset()
+
+    def _connect(self):
+        holder = _ThreadConnection(connect_db(self.path, query_only=True))
+        with self._lock:
+            self._holders.add(holder)
+        return holder
+
+    @contextmanager
+    def acquire(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = self._connect()
+        conn = holder.conn
+        try:
+            yield conn
+        finally:
+            # Never hand a half-finished transaction to the next caller.
+            if conn.in_transaction:
+                conn.rollback()
+
+    def close_all(self):
+        with self._lock:
+            holders = list(self._holders)
+        for holder in holders:
+            holder.finalizer()
+        self._local = threading.local()
+
+
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+pool = ConnectionPool(DB_PATH)
+
+
+@contextmanager
+def writer(conn):
+    # Take the write lock up front so concurrent writers queue on
+    # busy_timeout instead of failing to upgrade a deferred transaction.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class DatabaseWriter:
+    """Runs every write on one thread that owns the process's write connection.
+
+    SQLite allows a single writer at a time, so request threads queue their
+    write work here instead of racing each other for the lock; reads keep
+    using the read-only pooled connections concurrently.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _serve(self):
+        conn = None
+        while True:
+            job = self._queue.get()
+            if job is None:
+                if conn is not None:
+                    conn.close()
+                return
+            func, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if conn is None:
+                    conn = connect_db(self.path)
+                with writer(conn):
+                    result = func(conn)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    def run(self, func):
+        """Run ``func(conn)`` inside BEGIN IMMEDIATE on the writer thread."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((func, future))
+        return future.result()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+db_writer = DatabaseWriter(DB_PATH)
+
+
+# Hot-path SQL is kept as constants; since pooled connections live for the
+# whole process, sqlite3's per-connection statement cache keeps each one
+# prepared after its first use.
+
+# Pick and claim the next image in one statement. Each arm of the subquery
+# is a LIMIT 1 probe on idx_images_status_id; pending images win over
+# expired reservations.
+_SQL_RESERVE = """
+UPDATE images
+SET status = 'in_progress',
+    reserved_by = ?,
+    reserved_at = ?,
+    updated_at = ?
+WHERE id = (
+    SELECT id FROM (
+        SELECT * FROM (
+            SELECT 0 AS priority, id
+            FROM images
+            WHERE status = 'pending'
+            ORDER BY id
+            LIMIT 1
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 1 AS priority, id
+            FROM images
+            WHERE status = 'in_progress'
+              AND reserved_at IS NOT NULL
+              AND reserved_at <= ?
+            ORDER BY id
+            LIMIT 1
+        )
+    )
+    ORDER BY priority
+    LIMIT 1
+)
+RETURNING id, filename
+"""
+_SQL_FINALIZE_SELECT = "SELECT reserved_by FROM images WHERE id = ?"
+_SQL_FINALIZE_UPDATE = """
+UPDATE images
+SET status = 'done',
+    labels_json = ?,
+    reserved_by = NULL,
+    reserved_at = NULL,
+    skipped = ?,
+    updated_at = ?
+WHERE id = ?
+"""
+_SQL_RELEASE_ALL = """
+UPDATE images
+SET status = 'pending',
+    reserved_by = NULL,
+    reserved_at = NULL,
+    updated_at = ?
+WHERE status = 'in_progress'
+"""
+_SQL_COUNT_BY_STATUS = "SELECT COUNT(*) FROM images WHERE status = ?"
+# Answered from idx_images_status_id without touching the table rows.
+_SQL_STATUS_COUNTS = "SELECT status, COUNT(*) FROM images GROUP BY status"
+
+
+# Rows per multi-row INSERT; matches SQLITE_LIMIT_COMPOUND_SELECT's default
+# and keeps the bound parameters (one each plus the shared timestamp) under
+# the old 999-variable limit.
+SYNC_BATCH_SIZE = 500
+
+
+@lru_cache(maxsize=2)
+def _sql_sync_insert(rows):
+    # ?1 is the shared updated_at; ?2.. are the filenames.
+    values = ", ".join(f"(?{index}, 'pending', NULL, 0, ?1)" for index in range(2, rows + 2))
+    return (
+        "INSERT INTO images (filename, status, labels_json, skipped, updated_at) "
+        f"VALUES {values} ON CONFLICT (filename) DO NOTHING"
+    )
+
+
+def create_schema(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT UNIQUE NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            labels_json TEXT,
+            reserved_by TEXT,
+            reserved_at TEXT,
+            skipped INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_images_status_id ON images (status, id)"
+    )
+    # The expired-reservation probe walks the few in-progress rows through
+    # idx_images_status_id; a reserved_at index was never picked by the
+    # planner and only slowed every write, so drop it from older databases.
+    conn.execute("DROP INDEX IF EXISTS idx_images_inprogress")
+
+
+def init_db():
+    get_image_directory().mkdir(parents=True, exist_ok=True)
+    db_writer.run(create_schema)
 
 
 def sync_images():
+    global _last_sync_mtime
     image_dir = get_image_directory()
-    files = [
-        f
-        for f in sorted(image_dir.iterdir())
+    # Read before scanning so files added mid-scan still trigger a resync,
+    # but only record it once the insert has gone through.
+    mtime = image_dir.stat().st_mtime_ns
+    filenames = sorted(
+        f.name
+        for f in image_dir.iterdir()
         if f.is_file() and f.suffix.lower() in ALLOWED_EXTENSIONS
-    ]
+    )
 
-    if not files:
-        return
+    if not filenames:
+        _last_sync_mtime = mtime
+        return 0
 
-    conn = get_db_connection()
+    now = timestamp()
+
+    def write(conn):
+        changes_before = conn.total_changes
+        for start in range(0, len(filenames), SYNC_BATCH_SIZE):
+            batch = filenames[start:start + SYNC_BATCH_SIZE]
+            conn.execute(_sql_sync_insert(len(batch)), (now, *batch))
+        return conn.total_changes - changes_before
+
+    added = db_writer.run(write)
+    _last_sync_mtime = mtime
+    return added
+
+
+def _try_lock(lock_path):
+    import fcntl
+
+    lock_file = open(lock_path, "a")
     try:
-        cursor = conn.execute("SELECT filename FROM images")
-        known_files = {row["filename"] for row in cursor.fetchall()}
-        new_files = [f for f in files if f.name not in known_files]
-        if not new_files:
-            return
-        now = timestamp()
-        conn.executemany(
-            """
-            INSERT OR IGNORE INTO images (filename, status, labels_json, skipped, updated_at)
-            VALUES (?, 'pending', NULL, 0, ?)
-            """,
-            [(f.name, now) for f in new_files],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def watch_image_directory(lock_path=None):
+    # With lock_path, only the process holding the lock file scans; the OS
+    # drops the lock when that process exits and another one takes over.
+    lock_file = None
+    # Adding or removing a file bumps the directory mtime, so a stat per
+    # tick is enough to tell whether a full scan is worth doing.
+    while not _sync_stop.wait(SYNC_INTERVAL_SECONDS):
+        try:
+            if lock_path is not None and lock_file is None:
+                lock_file = _try_lock(lock_path)
+                if lock_file is None:
+                    continue
+            if get_image_directory().stat().st_mtime_ns == _last_sync_mtime:
+                continue
+            with _sync_lock:
+                sync_images()
+        except Exception:
+            app.logger.exception("Background image sync failed")
+
+
+def start_image_watcher(lock_path=None):
+    global _sync_thread
+    _sync_stop.clear()
+    _sync_thread = threading.Thread(
+        target=watch_image_directory, args=(lock_path,), name="image-sync", daemon=True
+    )
+    _sync_thread.start()
+    return _sync_thread
+
+
+def stop_image_watcher():
+    global _sync_thread
+    thread, _sync_thread = _sync_thread, None
+    _sync_stop.set()
+    if thread is not None:
+        thread.join()
 
 
 def reserve_next_image():
-    sync_images()
     config = load_config()
     timeout_seconds = int(config.get("reservation_timeout_seconds", 300))
-    now_dt = utcnow()
-    expiry_threshold = now_dt - timedelta(seconds=timeout_seconds)
-    expiry_threshold_iso = expiry_threshold.isoformat().replace("+00:00", "Z")
-    now_iso = now_dt.isoformat().replace("+00:00", "Z")
+    now_ns = time.time_ns()
+    expiry_threshold_iso = format_timestamp(now_ns - timeout_seconds * 1_000_000_000)
+    now_iso = format_timestamp(now_ns)
 
-    conn = get_db_connection()
-    try:
-        conn.execute("BEGIN IMMEDIATE")
-        row = conn.execute(
-            """
-            SELECT id, filename, status, reserved_at
-            FROM images
-            WHERE status = 'pending'
-               OR (
-                   status = 'in_progress'
-                   AND reserved_at IS NOT NULL
-                   AND reserved_at <= ?
-               )
-            ORDER BY CASE status WHEN 'pending' THEN 0 ELSE 1 END, id
-            LIMIT 1
-            """,
-            (expiry_threshold_iso,),
-        ).fetchone()
+    reservation_token = uuid.uuid4().hex
+    params = (reservation_token, now_iso, now_iso, expiry_threshold_iso)
+    row = db_writer.run(lambda conn: conn.execute(_SQL_RESERVE, params).fetchone())
+    if row is None:
+        return None
+    return {"id": row["id"], "filename": row["filename"], "token": reservation_token}
 
-        if row is None:
-            conn.commit()
-            return None
 
-        reservation_token = uuid.uuid4().hex
-        conn.execute(
-            """
-            UPDATE images
-            SET status = 'in_progress',
-                reserved_by = ?,
-                reserved_at = ?,
-                updated_at = ?
-            WHERE id = ?
-            """,
-            (reservation_token, now_iso, now_iso, row["id"]),
-        )
-        conn.commit()
-        return {"id": row["id"], "filename": row["filename"], "token": reservation_token}
-    finally:
-        conn.close()
+def encode_labels(labels):
+    return orjson.dumps(labels, option=orjson.OPT_SORT_KEYS).decode()
 
 
-def finalize_image(image_id, token, labels, skipped):
+def finalize_image(image_id, token, labels_json, skipped):
     now_iso = timestamp()
-    labels_json = json.dumps(labels, sort_keys=True)
-    conn = get_db_connection()
-    try:
-        conn.execute("BEGIN IMMEDIATE")
-        row = conn.execute(
-            "SELECT reserved_by FROM images WHERE id = ?", (image_id,)
-        ).fetchone()
+
+    def write(conn):
+        row = conn.execute(_SQL_FINALIZE_SELECT, (image_id,)).fetchone()
         if row is None:
-            conn.rollback()
             return False, "Image not found"
         if row["reserved_by"] != token:
-            conn.rollback()
             return False, "Reservation mismatch. Reload to get a new image."
         conn.execute(
-            """
-            UPDATE images
-            SET status = 'done',
-                labels_json = ?,
-                reserved_by = NULL,
-                reserved_at = NULL,
-                skipped = ?,
-                updated_at = ?
-            WHERE id = ?
-            """,
-            (labels_json, 1 if skipped else 0, now_iso, image_id),
+            _SQL_FINALIZE_UPDATE, (labels_json, 1 if skipped else 0, now_iso, image_id)
         )
-        conn.commit()
         return True, None
-    finally:
-        conn.close()
+
+    return db_writer.run(write)
 
 
 def release_all_reservations():
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            """
-            UPDATE images
-            SET status = 'pending',
-                reserved_by = NULL,
-                reserved_at = NULL,
-                updated_at = ?
-            WHERE status = 'in_progress'
-            """,
-            (timestamp(),),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    now_iso = timestamp()
+    db_writer.run(lambda conn: conn.execute(_SQL_RELEASE_ALL, (now_iso,)))
+
+
+def release_reservations_on_exit():
+    # Forked workers inherit this handler; only the process that ran the
+    # startup sequence may clear everyone's reservations.
+    if os.getpid() == _startup_pid:
+        release_all_reservations()
 
 
-def fetch_label_records(status=None, limit=None):
+def count_label_records(status=None):
+    if status in VALID_STATUSES:
+        with pool.acquire() as conn:
+            return conn.execute(_SQL_COUNT_BY_STATUS, (status,)).fetchone()[0]
+    return sum(get_status_counts().values())
+
+
+def iter_label_records(status=None, after_id=None, limit=None):
+    # labels_json goes out verbatim, so have SQLite minify valid JSON and
+    # quote anything else (e.g. hand-edited rows) as a JSON string.
     query = (
-        "SELECT id, filename, status, labels_json, skipped, reserved_by, "
-        "reserved_at, updated_at FROM images"
+        "SELECT id, filename, status, "
+        "CASE WHEN labels_json IS NULL OR labels_json = '' THEN '{}' "
+        "WHEN json_valid(labels_json) THEN json(labels_json) "
+        "ELSE json_quote(labels_json) END, "
+        "skipped, reserved_by, reserved_at, updated_at FROM images"
     )
     clauses = []
     params = []
@@ -235,6 +555,12 @@ def fetch_label_records(status=None, limit=None):
         clauses.append("status = ?")
         params.append(status)
 
+    # Keyset pagination: resume after the last id seen instead of OFFSET,
+    # so later pages cost the same as the first.
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+
     if clauses:
         query += " WHERE " + " AND ".join(clauses)
 
@@ -244,46 +570,58 @@ def fetch_label_records(status=None, limit=None):
         query += " LIMIT ?"
         params.append(limit)
 
-    conn = get_db_connection()
-    try:
-        rows = conn.execute(query, params).fetchall()
-    finally:
-        conn.close()
-
-    records = []
-    for row in rows:
-        labels_json = row[3]
+    with pool.acquire() as conn:
+        cursor = conn.execute(query, params)
         try:
-            labels = json.loads(labels_json) if labels_json else {}
-        except json.JSONDecodeError:
-            labels = labels_json
-        records.append(
-            {
-                "id": row[0],
-                "filename": row[1],
-                "status": row[2],
-                "labels": labels,
-                "skipped": bool(row[4]),
-                "reserved_by": row[5],
-                "reserved_at": row[6],
-                "updated_at": row[7],
-            }
-        )
-
-    return records
+            for row in cursor:
+                yield {
+                    "id": row[0],
+                    "filename": row[1],
+                    "status": row[2],
+                    "labels_raw": row[3],
+                    "skipped": bool(row[4]),
+                    "reserved_by": row[5],
+                    "reserved_at": row[6],
+                    "updated_at": row[7],
+                }
+        finally:
+            cursor.close()
+
+
+def encode_label_record(record):
+    # labels_raw is already well-formed, single-line JSON (see
+    # iter_label_records), so splice it in instead of decoding and
+    # re-encoding it.
+    fields = {key: value for key, value in record.items() if key != "labels_raw"}
+    head = orjson.dumps(fields)
+    return head[:-1] + b',"labels":' + record["labels_raw"].encode() + b"}"
+
+
+def iter_labels_json(records):
+    yield b'{"records":['
+    for index, record in enumerate(records):
+        if index:
+            yield b","
+        yield encode_label_record(record)
+    yield b"]}"
+
+
+def iter_labels_ndjson(records):
+    for record in records:
+        yield encode_label_record(record) + b"\n"
+
+
+def get_status_counts():
+    counts = dict.fromkeys(sorted(VALID_STATUSES), 0)
+    with pool.acquire() as conn:
+        for status, count in conn.execute(_SQL_STATUS_COUNTS):
+            counts[status] = count
+    return counts
 
 
 def get_progress_counts():
-    conn = get_db_connection()
-    try:
-        total = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
-        done = conn.execute(
-            "SELECT COUNT(*) FROM images WHERE status = 'done'"
-        ).fetchone()[0]
-    finally:
-        conn.close()
-
-    return {"done": done, "total": total}
+    counts = get_status_counts()
+    return {"done": counts["done"], "total": sum(counts.values())}
 
 
 @app.route("/")
@@ -337,7 +675,38 @@ def api_label():
     if not isinstance(labels, dict) or not any(labels.values()):
         abort(400, "At least one label must be selected to submit.")
 
-    success, error = finalize_image(image_id, token, labels, skipped=False)
+    labels_json = encode_labels(labels)
+    success, error = finalize_image(image_id, token, labels_json, skipped=False)
+    if not success:
+        abort(409, error)
+
+    return jsonify({"status": "ok"})
+
+
+@app.route("/api/label_raw", methods=["POST"])
+def api_label_raw():
+    payload = request.get_json(silent=True) or {}
+    image_id = payload.get("image_id")
+    token = payload.get("reservation_token")
+    labels_json = payload.get("labels_json")
+
+    if not image_id or not token:
+        abort(400, "image_id and reservation_token are required")
+
+    if not isinstance(labels_json, str):
+        abort(400, "labels_json must be a JSON-encoded string.")
+
+    # Parse only to validate; the client's text is stored as sent, and
+    # iter_label_records() minifies it on the way out.
+    try:
+        labels = orjson.loads(labels_json)
+    except orjson.JSONDecodeError:
+        abort(400, "labels_json is not valid JSON.")
+
+    if not isinstance(labels, dict) or not any(labels.values()):
+        abort(400, "At least one label must be selected to submit.")
+
+    success, error = finalize_image(image_id, token, labels_json, skipped=False)
     if not success:
         abort(409, error)
 
@@ -352,7 +721,7 @@ def api_skip():
     if not image_id or not token:
         abort(400, "image_id and reservation_token are required")
 
-    success, error = finalize_image(image_id, token, labels={}, skipped=True)
+    success, error = finalize_image(image_id, token, "{}", skipped=True)
     if not success:
         abort(409, error)
 
@@ -361,15 +730,63 @@ def api_skip():
 
 @app.route("/images/<path:filename>")
 def serve_image(filename):
-    image_dir = get_image_directory()
-    safe_path = (image_dir / filename).resolve()
-    if not safe_path.exists() or not safe_path.is_file():
-        abort(404)
-    try:
-        safe_path.relative_to(image_dir)
-    except ValueError:
-        abort(404)
-    return send_from_directory(image_dir, filename)
+    # send_from_directory rejects paths escaping image_dir and raises
+    # NotFound for missing files itself.
+    response = send_from_directory(
+        get_image_directory(), filename, conditional=True, max_age=IMAGE_CACHE_SECONDS
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def gzip_chunks(chunks):
+    # wbits=31 produces a gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@app.after_request
+def gzip_response(response):
+    if (
+        request.endpoint not in GZIP_ENDPOINTS
+        or response.status_code != 200
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings["gzip"] <= 0:
+        return response
+
+    if response.is_streamed:
+        # Buffer just enough of the stream to know whether it clears the
+        # threshold; short bodies go out uncompressed.
+        original = response.response
+        chunks = response.iter_encoded()
+        head = []
+        size = 0
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= GZIP_MIN_BYTES:
+                break
+        if size < GZIP_MIN_BYTES:
+            response.set_data(b"".join(head))
+            return response
+        response.response = gzip_chunks(itertools.chain(head, chunks))
+        if hasattr(original, "close"):
+            response.call_on_close(original.close)
+    else:
+        data = response.get_data()
+        if len(data) < GZIP_MIN_BYTES:
+            return response
+        response.set_data(b"".join(gzip_chunks([data])))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 @app.errorhandler(HTTPException)
@@ -379,6 +796,15 @@ def handle_http_exception(exc):
     return response
 
 
+@app.errorhandler(NotFound)
+def handle_not_found(exc):
+    # Missing images are requested by <img> tags, which never read the body;
+    # skip building a JSON error for them.
+    if request.path.startswith("/images/"):
+        return Response(status=404)
+    return handle_http_exception(exc)
+
+
 @app.errorhandler(Exception)
 def handle_unexpected_exception(exc):
     app.logger.exception("Unhandled exception: %s", exc)
@@ -389,8 +815,25 @@ def handle_unexpected_exception(exc):
 def api_labels_view():
     status_filter = request.args.get("status")
     limit = request.args.get("limit", type=int)
-    records = fetch_label_records(status=status_filter, limit=limit)
-    return jsonify({"records": records})
+    after_id = request.args.get("after", type=int)
+    records = iter_label_records(status=status_filter, after_id=after_id, limit=limit)
+    return Response(iter_labels_json(records), mimetype="application/json")
+
+
+@app.route("/api/labels.ndjson")
+def api_labels_ndjson():
+    status_filter = request.args.get("status")
+    limit = request.args.get("limit", type=int)
+    after_id = request.args.get("after", type=int)
+    records = iter_label_records(status=status_filter, after_id=after_id, limit=limit)
+    return Response(iter_labels_ndjson(records), mimetype="application/x-ndjson")
+
+
+@app.route("/admin/rescan", methods=["POST"])
+def admin_rescan():
+    with _sync_lock:
+        added = sync_images()
+    return jsonify({"status": "ok", "added": added, "progress": get_progress_counts()})
 
 
 @app.route("/api/progress")
@@ -398,29 +841,49 @@ def api_progress():
     return jsonify(get_progress_counts())
 
 
+@app.route("/api/summary")
+def api_summary():
+    counts = get_status_counts()
+    return jsonify({"statuses": counts, "total": sum(counts.values())})
+
+
 @app.route("/labels")
 def labels_view():
     status_param = request.args.get("status", "all")
     limit = request.args.get("limit", type=int)
+    after_id = request.args.get("after", type=int)
+    page_size = limit if limit and limit > 0 else LABELS_PAGE_SIZE
 
     status_filter = status_param if status_param in VALID_STATUSES else None
-    records = fetch_label_records(status=status_filter, limit=limit)
+    total_count = count_label_records(status=status_filter)
+    records = iter_label_records(status=status_filter, after_id=after_id, limit=page_size)
+    first_record = next(records, None)
+    if first_record is not None:
+        records = itertools.chain([first_record], records)
     statuses = ["all"] + sorted(VALID_STATUSES)
 
-    return render_template(
+    return stream_template(
         "labels.html",
         records=records,
+        has_records=first_record is not None,
         statuses=statuses,
         current_status=status_param if status_param in statuses else "all",
         limit_value=limit if limit and limit > 0 else "",
-        total_count=len(records),
+        page_size=page_size,
+        after_id=after_id,
+        total_count=total_count,
     )
 
 
 init_db()
+sync_images()
 release_all_reservations()
-atexit.register(release_all_reservations)
+start_image_watcher()
+atexit.register(pool.close_all)
+atexit.register(db_writer.stop)
+atexit.register(stop_image_watcher)
+atexit.register(release_reservations_on_exit)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000)
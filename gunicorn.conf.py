@@ -0,0 +1,28 @@
+"""Gunicorn settings for the labelling server.
+
+    gunicorn -c gunicorn.conf.py -k gthread --threads 8 -w "$(nproc)" -b 0.0.0.0:5000 wsgi:app
+
+The app is preloaded so startup (schema, initial image scan, releasing stale
+reservations) runs once in the master. The master then drops its SQLite
+connections and background threads before forking any worker: a worker forked
+while the master sat inside a write transaction would inherit SQLite's lock
+state and never get the write lock itself.
+"""
+
+preload_app = True
+
+
+def when_ready(server):
+    import app
+
+    app.stop_image_watcher()
+    app.db_writer.stop()
+    app.pool.close_all()
+
+
+def post_fork(server, worker):
+    import app
+
+    # Every worker runs a watcher, but only the one holding the lock file
+    # scans; if it exits, another worker picks the lock up on its next tick.
+    app.start_image_watcher(lock_path=app.DATA_DIR / "image-sync.lock")
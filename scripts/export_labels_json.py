@@ -4,7 +4,8 @@
 This utility reads the SQLite database used by the labeling tool, finds every
 image whose status is marked as ``done``, and writes the stored ``labels_json``
 payload into a ``.json`` file that sits alongside the source image. The JSON
-files use the same base name as their corresponding images.
+files use the same base name as their corresponding images. The payload is
+written as stored unless ``--pretty`` asks for indented output.
 """
 
 from __future__ import annotations
@@ -12,6 +13,7 @@ from __future__ import annotations
 import argparse
 import json
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
@@ -20,6 +22,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_DB_PATH = BASE_DIR / "data" / "labels.db"
 DEFAULT_CONFIG_PATH = BASE_DIR / "config.json"
 
+# Resolved image directory per config file, so repeated export_labels() calls
+# from one process read and resolve each config only once.
+_IMAGE_DIRS: dict = {}
+
 
 def load_config(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as fh:
@@ -35,19 +41,46 @@ def resolve_image_directory(config: dict) -> Path:
     return image_dir
 
 
-def export_labels(db_path: Path, config_path: Path, overwrite: bool = True) -> Tuple[int, int]:
+def render_labels(labels_json: str, pretty: bool) -> bytes:
+    content = labels_json
+    if pretty:
+        try:
+            parsed = json.loads(labels_json)
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, (dict, list)):
+            content = json.dumps(parsed, indent=2, sort_keys=True)
+    if not content.endswith("\n"):
+        content += "\n"
+    return content.encode("utf-8")
+
+
+def write_export(json_path: Path, content: bytes, overwrite: bool) -> bool:
+    if json_path.exists() and not overwrite:
+        return False
+    json_path.write_bytes(content)
+    return True
+
+
+def export_labels(
+    db_path: Path,
+    config_path: Path,
+    overwrite: bool = True,
+    pretty: bool = False,
+    max_workers: int = 8,
+) -> Tuple[int, int]:
     if not db_path.exists():
         raise FileNotFoundError(f"Database not found: {db_path}")
     if not config_path.exists():
         raise FileNotFoundError(f"Config not found: {config_path}")
 
-    config = load_config(config_path)
-    image_dir = resolve_image_directory(config)
+    config_key = config_path.resolve()
+    image_dir = _IMAGE_DIRS.get(config_key)
+    if image_dir is None:
+        image_dir = _IMAGE_DIRS[config_key] = resolve_image_directory(load_config(config_path))
 
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
-    exported = 0
-    skipped = 0
 
     try:
         rows = conn.execute(
@@ -60,40 +93,27 @@ def export_labels(db_path: Path, config_path: Path, overwrite: bool = True) -> T
     finally:
         conn.close()
 
-    for row in rows:
-        filename = row["filename"]
-        labels_json = row["labels_json"]
+    jobs = [
+        (image_dir / Path(row["filename"]).with_suffix(".json"), row["labels_json"])
+        for row in rows
+    ]
 
-        if not labels_json:
-            skipped += 1
-            continue
+    # Create each output directory once rather than once per file.
+    for parent in {json_path.parent for json_path, _ in jobs}:
+        parent.mkdir(parents=True, exist_ok=True)
 
-        json_rel_path = Path(filename).with_suffix(".json")
-        json_path = image_dir / json_rel_path
-        json_path.parent.mkdir(parents=True, exist_ok=True)
+    # The stored labels are already serialized JSON, so unless pretty output
+    # is requested the writes are pure I/O and parallelise across threads.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                lambda job: write_export(job[0], render_labels(job[1], pretty), overwrite),
+                jobs,
+            )
+        )
 
-        if json_path.exists() and not overwrite:
-            skipped += 1
-            continue
-
-        content = labels_json
-        try:
-            parsed = json.loads(labels_json)
-        except json.JSONDecodeError:
-            parsed = None
-
-        with json_path.open("w", encoding="utf-8") as fh:
-            if isinstance(parsed, (dict, list)):
-                json.dump(parsed, fh, indent=2, sort_keys=True)
-                fh.write("\n")
-            else:
-                fh.write(content)
-                if not content.endswith("\n"):
-                    fh.write("\n")
-
-        exported += 1
-
-    return exported, skipped
+    exported = sum(results)
+    return exported, len(results) - exported
 
 
 def parse_args() -> argparse.Namespace:
@@ -115,12 +135,19 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip exporting if the JSON file already exists.",
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Re-indent the stored JSON instead of writing it verbatim.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    exported, skipped = export_labels(args.db, args.config, overwrite=not args.skip_existing)
+    exported, skipped = export_labels(
+        args.db, args.config, overwrite=not args.skip_existing, pretty=args.pretty
+    )
     print(f"Wrote {exported} file(s).", end="")
     if skipped:
         print(f" Skipped {skipped} row(s).")
@@ -27,55 +27,33 @@ def utc_timestamp() -> str:
 
 
 def update_labels(db_path: Path) -> int:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    updated_rows = 0
+    # Replace the quoted JSON string rather than the bare phrase so labels
+    # that merely contain "blurry image" as a substring are left alone.
+    old_literal = json.dumps(OLD_VALUE)
+    new_literal = json.dumps(NEW_VALUE)
 
+    conn = sqlite3.connect(db_path, isolation_level=None)
     try:
+        conn.execute("BEGIN IMMEDIATE")
         cursor = conn.execute(
-            "SELECT id, labels_json FROM images WHERE labels_json LIKE ?",
-            (f"%{OLD_VALUE}%",),
+            """
+            UPDATE images
+            SET labels_json = REPLACE(labels_json, ?, ?),
+                updated_at = ?
+            WHERE instr(labels_json, ?) > 0
+              AND json_valid(labels_json)
+            """,
+            (old_literal, new_literal, utc_timestamp(), old_literal),
         )
-
-        rows = cursor.fetchall()
-        for row in rows:
-            raw = row["labels_json"]
-            if not raw:
-                continue
-
-            try:
-                payload = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-
-            if not isinstance(payload, dict):
-                continue
-
-            changed = False
-            for category, labels in payload.items():
-                if not isinstance(labels, list):
-                    continue
-
-                new_labels = [NEW_VALUE if label == OLD_VALUE else label for label in labels]
-                if new_labels != labels:
-                    payload[category] = new_labels
-                    changed = True
-
-            if not changed:
-                continue
-
-            conn.execute(
-                "UPDATE images SET labels_json = ?, updated_at = ? WHERE id = ?",
-                (json.dumps(payload, sort_keys=True), utc_timestamp(), row["id"]),
-            )
-            updated_rows += 1
-
-        conn.commit()
+        conn.execute("COMMIT")
+        return cursor.rowcount
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
     finally:
         conn.close()
 
-    return updated_rows
-
 
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
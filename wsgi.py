@@ -0,0 +1,8 @@
+"""WSGI entry point for running the labelling server under gunicorn.
+
+    gunicorn -c gunicorn.conf.py -k gthread --threads 8 -w "$(nproc)" -b 0.0.0.0:5000 wsgi:app
+"""
+
+from app import app
+
+__all__ = ["app"]